@@ -34,17 +34,23 @@ class Config:
     CURRENCY_PAIR: str = "EURUSD=X"  # Will be inverted to get USD/EUR rate
     USD_TICKERS: List[str] = ["SPY", "IEV", "EEM", "VLUE", "MTUM", "QUAL", "USMV"]  # Tickers that need USD to EUR conversion
     
-    # Date Range for Analysis (defaults, Portuguese format: DD/MM/YYYY)
-    START_DATE: str = "01/01/2000"
-    END_DATE: str = datetime.now().strftime("%d/%m/%Y")
+    # Date Range for Analysis (defaults)
+    START_DATE: datetime = datetime(2000, 1, 1)
+    END_DATE: datetime = datetime.now()
+    
+    # Download Cache Settings
+    CACHE_TTL_HOURS: float = 12.0  # Max age of cached prices for ranges ending today
     
     # Visualization Settings
     PLOT_THEME: str = "dark"  # matplotx github theme
     FIGURE_SIZE: tuple = (12, 8)
-    DPI: int = 300
+    DPI: int = 300  # Detail-heavy charts (correlation heatmaps)
+    RASTER_DPI: int = 150  # Line, bar and pie charts
+    PNG_COMPRESS_LEVEL: int = 1  # zlib level 0-9; higher is smaller but slower
     SAVE_FORMAT: str = "png"
     
     # Analysis Settings
+    DATA_DTYPE: str = "float32"  # Dtype for prices/returns ("float64" for full precision)
     RISK_FREE_RATE: float = 0.02  # Annual risk-free rate (2%)
     TRADING_DAYS_PER_YEAR: int = 252
     
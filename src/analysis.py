@@ -2,10 +2,109 @@
 Performance Analysis Module.
 Calculates key performance metrics including returns, drawdowns, and correlations.
 """
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
 
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+from src.analysis_numba import NUMBA_AVAILABLE, NUMBA_MIN_SIZE
+
+if NUMBA_AVAILABLE:
+    from src.analysis_numba import max_drawdown_kernel, perf_kernel
+
+
+def _masked_std(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Column-wise sample standard deviation over the masked observations only.
+    
+    Args:
+        values: 2D array (days x assets)
+        mask: Boolean array shaped like values selecting the observations to use
+        
+    Returns:
+        Array with the standard deviation of each column (NaN below 2 observations)
+    """
+    n_selected = mask.sum(axis=0)
+    
+    # Mean and squared deviations over the selected observations, without a masked copy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(mask, values, 0.0).sum(axis=0) / n_selected
+        deviations = np.where(mask, values - mean, 0.0)
+        variance = (deviations * deviations).sum(axis=0) / (n_selected - 1)
+    variance[n_selected < 2] = np.nan
+    
+    return np.sqrt(variance)
+
+
+def sample_std(values: np.ndarray) -> np.ndarray:
+    """
+    Column-wise sample standard deviation that skips NaNs, like DataFrame.std().
+    
+    Args:
+        values: 2D array (days x assets), may contain NaNs
+        
+    Returns:
+        Array with the standard deviation of each column (NaN below 2 observations)
+    """
+    valid = ~np.isnan(values)
+    
+    # No gaps: the plain two-pass reduction gives the same result
+    if valid.all():
+        return values.std(axis=0, ddof=1)
+    
+    return _masked_std(values, valid)
+
+
+def drawdown_array(prices: np.ndarray) -> np.ndarray:
+    """
+    Drawdown of every column of a price matrix.
+    Drawdown = (Current Price - Peak Price) / Peak Price
+    
+    Args:
+        prices: 2D price array (days x assets), may contain NaNs
+        
+    Returns:
+        Array of drawdowns shaped like the price matrix
+    """
+    # Running maximum (peak) of every column in a single pass, skipping missing prices
+    peak = np.fmax.accumulate(prices, axis=0)
+    return (prices - peak) / peak
+
+
+def correlation_matrix(returns: np.ndarray, columns: pd.Index) -> pd.DataFrame:
+    """
+    Pearson correlation matrix of a returns array.
+    
+    Args:
+        returns: 2D daily return array (days x assets)
+        columns: Asset labels for the rows and columns of the result
+        
+    Returns:
+        DataFrame containing pairwise correlations
+    """
+    # Gaps need pairwise-complete observations, which only DataFrame.corr() handles
+    if np.isnan(returns).any():
+        corr = pd.DataFrame(returns, columns=columns).corr()
+    else:
+        # Standardize each column, then one X^T X matrix product gives every pair
+        x = returns - returns.mean(axis=0)
+        x /= x.std(axis=0, ddof=1)
+        corr = pd.DataFrame((x.T @ x) / (x.shape[0] - 1), index=columns, columns=columns)
+    
+    # Report in full precision even when the inputs are float32
+    return corr.astype(np.float64)
+
 
 class PerformanceAnalyzer:
     """
@@ -21,8 +120,47 @@ class PerformanceAnalyzer:
             returns: DataFrame containing daily returns for each asset
         """
         self.returns: pd.DataFrame = returns
-        self.prices: pd.DataFrame = self._returns_to_prices(returns)
+        self.initial_value: float = 100.0
+        self.prices: pd.DataFrame = self._returns_to_prices(returns, self.initial_value)
+        
+        # Returns are not mutated after construction, so cache the raw arrays and labels once
+        self._returns_np: np.ndarray = returns.to_numpy(copy=False)
+        self._prices_np: np.ndarray = self.prices.to_numpy(copy=False)
+        self._index: pd.Index = returns.index
+        self._columns: pd.Index = returns.columns
+        
+    @classmethod
+    def from_polars(
+        cls,
+        returns: Union["pl.LazyFrame", "pl.DataFrame"],
+        date_column: Optional[str] = "Date"
+    ) -> "PerformanceAnalyzer":
+        """
+        Build an analyzer from a Polars frame of daily returns.
+        A LazyFrame's query plan (scans, filters, joins, casts) is collected
+        exactly once; every metric then reuses the resulting array.
         
+        Args:
+            returns: Polars LazyFrame or DataFrame with one column per asset
+            date_column: Name of the date column to use as index (None if absent)
+            
+        Returns:
+            PerformanceAnalyzer over the collected returns
+        """
+        if not POLARS_AVAILABLE:
+            raise ImportError("polars is required for PerformanceAnalyzer.from_polars")
+        
+        if isinstance(returns, pl.LazyFrame):
+            returns = returns.collect()
+        
+        if date_column is not None and date_column in returns.columns:
+            index = pd.DatetimeIndex(returns.get_column(date_column).to_numpy())
+            returns = returns.drop(date_column)
+        else:
+            index = pd.RangeIndex(returns.height)
+        
+        return cls(pd.DataFrame(returns.to_numpy(), index=index, columns=returns.columns))
+    
     @staticmethod
     def _returns_to_prices(returns: pd.DataFrame, initial_value: float = 100.0) -> pd.DataFrame:
         """
@@ -55,17 +193,8 @@ class PerformanceAnalyzer:
         Returns:
             DataFrame with drawdown values (negative percentages)
         """
-        drawdowns = pd.DataFrame(index=self.prices.index)
-        
-        for column in self.prices.columns:
-            # Calculate running maximum (peak)
-            running_max = self.prices[column].expanding().max()
-            
-            # Calculate drawdown
-            drawdown = (self.prices[column] - running_max) / running_max
-            drawdowns[column] = drawdown
-            
-        return drawdowns
+        drawdowns = drawdown_array(self._prices_np)
+        return pd.DataFrame(drawdowns, index=self._index, columns=self._columns)
     
     def calculate_max_drawdown(self) -> pd.Series:
         """
@@ -74,8 +203,30 @@ class PerformanceAnalyzer:
         Returns:
             Series with maximum drawdown values
         """
-        drawdowns = self.calculate_drawdowns()
-        return drawdowns.min()
+        if NUMBA_AVAILABLE and self._prices_np.size > NUMBA_MIN_SIZE:
+            max_drawdowns = max_drawdown_kernel(self._prices_np)
+        else:
+            drawdowns = drawdown_array(self._prices_np)
+            max_drawdowns = np.nanmin(drawdowns, axis=0)
+        
+        return pd.Series(max_drawdowns, index=self._columns)
+    
+    def calculate_cumulative_and_drawdowns(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Calculate cumulative returns and drawdowns together.
+        Both are read off the cached normalized price matrix, so the returns
+        are not compounded a second time.
+        
+        Returns:
+            Tuple of (cumulative returns, drawdowns) DataFrames
+        """
+        cumulative_returns = self._prices_np / self.initial_value - 1
+        drawdowns = drawdown_array(self._prices_np)
+        
+        return (
+            pd.DataFrame(cumulative_returns, index=self._index, columns=self._columns),
+            pd.DataFrame(drawdowns, index=self._index, columns=self._columns)
+        )
     
     def calculate_correlation_matrix(self) -> pd.DataFrame:
         """
@@ -84,7 +235,18 @@ class PerformanceAnalyzer:
         Returns:
             DataFrame containing pairwise correlations
         """
-        return self.returns.corr()
+        return correlation_matrix(self._returns_np, self._columns)
+    
+    def calculate_total_return(self) -> pd.Series:
+        """
+        Calculate total return over the whole period for each asset.
+        Reuses the normalized price series instead of compounding returns again.
+        
+        Returns:
+            Series with total returns (as decimals, not percentages)
+        """
+        total_return = self._prices_np[-1] / self.initial_value - 1
+        return pd.Series(total_return, index=self._columns)
     
     def calculate_annualized_return(self, trading_days: int = 252) -> pd.Series:
         """
@@ -96,12 +258,17 @@ class PerformanceAnalyzer:
         Returns:
             Series with annualized returns
         """
-        total_days = len(self.returns)
-        total_return = (1 + self.returns).prod() - 1
+        total_days = len(self._returns_np)
         years = total_days / trading_days
         
-        annualized = (1 + total_return) ** (1 / years) - 1
-        return annualized
+        # The last normalized price is the compounded growth unless a column ends in a gap;
+        # then compound the returns directly, skipping NaNs like (1 + r).prod()
+        growth = self._prices_np[-1] / self.initial_value
+        if np.isnan(growth).any():
+            growth = np.nanprod(1 + self._returns_np, axis=0)
+        
+        annualized = growth ** (1 / years) - 1
+        return pd.Series(annualized, index=self._columns)
     
     def calculate_annualized_volatility(self, trading_days: int = 252) -> pd.Series:
         """
@@ -113,12 +280,30 @@ class PerformanceAnalyzer:
         Returns:
             Series with annualized volatilities
         """
-        return self.returns.std() * np.sqrt(trading_days)
+        volatility = sample_std(self._returns_np) * np.sqrt(trading_days)
+        return pd.Series(volatility, index=self._columns)
+    
+    def calculate_downside_volatility(self, trading_days: int = 252) -> pd.Series:
+        """
+        Calculate annualized downside volatility (negative returns only) for each asset.
+        
+        Args:
+            trading_days: Number of trading days per year
+            
+        Returns:
+            Series with annualized downside volatilities
+        """
+        # Sample std of the negative returns only (NaNs compare False and drop out)
+        arr = self._returns_np
+        downside_std = pd.Series(_masked_std(arr, arr < 0), index=self._columns)
+        return downside_std * np.sqrt(trading_days)
     
     def calculate_sharpe_ratio(
         self,
         risk_free_rate: float = 0.02,
-        trading_days: int = 252
+        trading_days: int = 252,
+        ann_return: Optional[pd.Series] = None,
+        ann_vol: Optional[pd.Series] = None
     ) -> pd.Series:
         """
         Calculate Sharpe ratio for each asset.
@@ -127,12 +312,16 @@ class PerformanceAnalyzer:
         Args:
             risk_free_rate: Annual risk-free rate (default: 2%)
             trading_days: Number of trading days per year
+            ann_return: Precomputed annualized returns (computed if omitted)
+            ann_vol: Precomputed annualized volatilities (computed if omitted)
             
         Returns:
             Series with Sharpe ratios
         """
-        ann_return = self.calculate_annualized_return(trading_days)
-        ann_vol = self.calculate_annualized_volatility(trading_days)
+        if ann_return is None:
+            ann_return = self.calculate_annualized_return(trading_days)
+        if ann_vol is None:
+            ann_vol = self.calculate_annualized_volatility(trading_days)
         
         sharpe = (ann_return - risk_free_rate) / ann_vol
         return sharpe
@@ -140,7 +329,9 @@ class PerformanceAnalyzer:
     def calculate_sortino_ratio(
         self,
         risk_free_rate: float = 0.02,
-        trading_days: int = 252
+        trading_days: int = 252,
+        ann_return: Optional[pd.Series] = None,
+        downside_vol: Optional[pd.Series] = None
     ) -> pd.Series:
         """
         Calculate Sortino ratio for each asset.
@@ -149,16 +340,16 @@ class PerformanceAnalyzer:
         Args:
             risk_free_rate: Annual risk-free rate (default: 2%)
             trading_days: Number of trading days per year
+            ann_return: Precomputed annualized returns (computed if omitted)
+            downside_vol: Precomputed downside volatilities (computed if omitted)
             
         Returns:
             Series with Sortino ratios
         """
-        ann_return = self.calculate_annualized_return(trading_days)
-        
-        # Calculate downside deviation (only negative returns)
-        downside_returns = self.returns[self.returns < 0]
-        downside_std = downside_returns.std()
-        downside_vol = downside_std * np.sqrt(trading_days)
+        if ann_return is None:
+            ann_return = self.calculate_annualized_return(trading_days)
+        if downside_vol is None:
+            downside_vol = self.calculate_downside_volatility(trading_days)
         
         sortino = (ann_return - risk_free_rate) / downside_vol
         return sortino
@@ -178,16 +369,35 @@ class PerformanceAnalyzer:
         Returns:
             DataFrame with all key performance metrics
         """
+        # Compute each building block once and share it across the ratios
+        total_return = self.calculate_total_return()
+        downside_vol = self.calculate_downside_volatility(trading_days)
+        
+        if NUMBA_AVAILABLE and self._returns_np.size > NUMBA_MIN_SIZE:
+            ann_return, ann_vol, sharpe = (
+                pd.Series(values, index=self._columns)
+                for values in perf_kernel(self._returns_np, risk_free_rate, trading_days)
+            )
+        else:
+            ann_return = self.calculate_annualized_return(trading_days)
+            ann_vol = self.calculate_annualized_volatility(trading_days)
+            sharpe = self.calculate_sharpe_ratio(
+                risk_free_rate, trading_days, ann_return=ann_return, ann_vol=ann_vol
+            )
+        
         summary = pd.DataFrame({
-            'Total Return': self.calculate_cumulative_returns().iloc[-1],
-            'Annualized Return': self.calculate_annualized_return(trading_days),
-            'Annualized Volatility': self.calculate_annualized_volatility(trading_days),
-            'Sharpe Ratio': self.calculate_sharpe_ratio(risk_free_rate, trading_days),
-            'Sortino Ratio': self.calculate_sortino_ratio(risk_free_rate, trading_days),
+            'Total Return': total_return,
+            'Annualized Return': ann_return,
+            'Annualized Volatility': ann_vol,
+            'Sharpe Ratio': sharpe,
+            'Sortino Ratio': self.calculate_sortino_ratio(
+                risk_free_rate, trading_days, ann_return=ann_return, downside_vol=downside_vol
+            ),
             'Max Drawdown': self.calculate_max_drawdown()
         })
         
-        return summary
+        # Report in full precision even when the inputs are float32
+        return summary.astype(np.float64)
     
     def get_rolling_metrics(
         self,
@@ -205,12 +415,42 @@ class PerformanceAnalyzer:
             DataFrame with rolling metric values
         """
         if metric == 'volatility':
-            return self.returns.rolling(window=window).std() * np.sqrt(252)
+            values = self._rolling_std(window) * np.sqrt(252)
         elif metric == 'return':
-            return self.returns.rolling(window=window).mean() * 252
+            values = self._rolling_mean(window) * 252
         elif metric == 'sharpe':
-            rolling_return = self.returns.rolling(window=window).mean() * 252
-            rolling_vol = self.returns.rolling(window=window).std() * np.sqrt(252)
-            return rolling_return / rolling_vol
+            rolling_return = self._rolling_mean(window) * 252
+            rolling_vol = self._rolling_std(window) * np.sqrt(252)
+            values = rolling_return / rolling_vol
         else:
             raise ValueError(f"Unknown metric: {metric}")
+        
+        return pd.DataFrame(values, index=self._index, columns=self._columns)
+    
+    def _rolling_mean(self, window: int) -> np.ndarray:
+        """
+        Rolling mean of returns, using bottleneck's O(T) moving window if available.
+        
+        Args:
+            window: Rolling window size in days
+            
+        Returns:
+            Array of rolling means (NaN until the window is full)
+        """
+        if BOTTLENECK_AVAILABLE:
+            return bn.move_mean(self._returns_np, window, axis=0)
+        return self.returns.rolling(window=window).mean().to_numpy()
+    
+    def _rolling_std(self, window: int) -> np.ndarray:
+        """
+        Rolling sample standard deviation of returns, using bottleneck if available.
+        
+        Args:
+            window: Rolling window size in days
+            
+        Returns:
+            Array of rolling standard deviations (NaN until the window is full)
+        """
+        if BOTTLENECK_AVAILABLE:
+            return bn.move_std(self._returns_np, window, axis=0, ddof=1)
+        return self.returns.rolling(window=window).std().to_numpy()
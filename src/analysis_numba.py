@@ -0,0 +1,99 @@
+"""
+JIT-compiled Analysis Kernels.
+Numba implementations of the performance metrics, used by PerformanceAnalyzer
+for large return matrices when numba is installed.
+"""
+from typing import Tuple
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Number of matrix elements above which the JIT kernels are used
+NUMBA_MIN_SIZE: int = 1_000_000
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def max_drawdown_kernel(prices: np.ndarray) -> np.ndarray:
+        """
+        Maximum drawdown per column in one scan, without peak/drawdown temporaries.
+        Columns are independent, so they are processed in parallel.
+        
+        Args:
+            prices: 2D price array (days x assets), may contain NaNs
+        
+        Returns:
+            Array with the maximum drawdown of each column
+        """
+        n_days, n_assets = prices.shape
+        max_drawdowns = np.empty(n_assets)
+        
+        for j in prange(n_assets):
+            peak = np.nan
+            max_dd = np.nan
+            for i in range(n_days):
+                price = prices[i, j]
+                if np.isnan(price):
+                    continue
+                if np.isnan(peak) or price > peak:
+                    peak = price
+                drawdown = (price - peak) / peak
+                if np.isnan(max_dd) or drawdown < max_dd:
+                    max_dd = drawdown
+            max_drawdowns[j] = max_dd
+        
+        return max_drawdowns
+
+    @njit(parallel=True, cache=True)
+    def perf_kernel(
+        returns: np.ndarray,
+        risk_free_rate: float,
+        trading_days: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Annualized return, annualized volatility and Sharpe ratio per column
+        in a single pass, using Welford's running mean/M2 for the variance.
+        Columns are independent, so they are processed in parallel.
+        
+        Args:
+            returns: 2D daily return array (days x assets), may contain NaNs
+            risk_free_rate: Annual risk-free rate
+            trading_days: Number of trading days per year
+        
+        Returns:
+            Tuple of (annualized return, annualized volatility, Sharpe ratio) arrays
+        """
+        n_days, n_assets = returns.shape
+        ann_return = np.empty(n_assets)
+        ann_vol = np.empty(n_assets)
+        sharpe = np.empty(n_assets)
+        years = n_days / trading_days
+        
+        for j in prange(n_assets):
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+            growth = 1.0
+            for i in range(n_days):
+                r = np.float64(returns[i, j])
+                # Skip gaps, as the NaN-skipping pandas reductions do
+                if np.isnan(r):
+                    continue
+                count += 1
+                growth *= 1.0 + r
+                delta = r - mean
+                mean += delta / count
+                m2 += delta * (r - mean)
+            
+            ann_return[j] = growth ** (1.0 / years) - 1.0
+            if count < 2:
+                ann_vol[j] = np.nan
+            else:
+                ann_vol[j] = np.sqrt(m2 / (count - 1)) * np.sqrt(trading_days)
+            sharpe[j] = (ann_return[j] - risk_free_rate) / ann_vol[j]
+        
+        return ann_return, ann_vol, sharpe
@@ -2,8 +2,13 @@
 Factor Data Loader Module.
 Handles data ingestion from Yahoo Finance with currency conversion and fallback mock data.
 """
+import glob
+import hashlib
 import warnings
-from typing import Dict, Optional, List
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Optional, List, Tuple
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -17,6 +22,12 @@ except ImportError:
     YFINANCE_AVAILABLE = False
     warnings.warn("yfinance not available. Will use mock data.")
 
+try:
+    import pyarrow  # noqa: F401 - parquet engine for the download cache
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 
 class FactorDataLoader:
     """
@@ -25,24 +36,153 @@ class FactorDataLoader:
     Provides fallback mock data if yfinance fails.
     """
     
-    def __init__(self, start_date: str, end_date: str, currency_pair: str = "EURUSD=X"):
+    def __init__(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        currency_pair: str = "EURUSD=X",
+        cache_dir: Optional[Path] = None,
+        cache_ttl_hours: float = 12.0,
+        dtype: str = "float32"
+    ):
         """
         Initialize the data loader.
         
         Args:
-            start_date: Start date for data retrieval (DD/MM/YYYY)
-            end_date: End date for data retrieval (DD/MM/YYYY)
+            start_date: Start date for data retrieval
+            end_date: End date for data retrieval
             currency_pair: Currency pair ticker for conversion (default: EURUSD=X)
+            cache_dir: Directory for cached downloads (None disables caching)
+            cache_ttl_hours: Maximum cache age when the range includes today
+            dtype: Numeric dtype of the loaded prices and returns
         """
-        # Convert Portuguese date format (DD/MM/YYYY) to ISO format (YYYY-MM-DD) for yfinance
-        self.start_date: str = datetime.strptime(start_date, "%d/%m/%Y").strftime("%Y-%m-%d")
-        self.end_date: str = datetime.strptime(end_date, "%d/%m/%Y").strftime("%Y-%m-%d")
+        # Format once as ISO (YYYY-MM-DD), as expected by yfinance
+        self.start_date: str = start_date.strftime("%Y-%m-%d")
+        self.end_date: str = end_date.strftime("%Y-%m-%d")
         self.currency_pair: str = currency_pair
+        self.cache_dir: Optional[Path] = Path(cache_dir) if cache_dir is not None else None
+        self.cache_ttl_hours: float = cache_ttl_hours
+        self.dtype: str = dtype
         self.usd_eur_rate: Optional[pd.Series] = None
         
+    def _cache_path(self, key: str) -> Path:
+        """
+        Build the cache file path for a cache key and the loader's date range.
+        
+        Args:
+            key: Ticker symbol or other cache key
+            
+        Returns:
+            Path of the parquet cache file
+        """
+        return self.cache_dir / f"{key}_{self.start_date}_{self.end_date}.parquet"
+    
+    def _read_cache(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Read previously stored data for a cache key from disk.
+        Ranges ending today or later can still change, so those entries
+        expire after cache_ttl_hours; closed historical ranges never expire.
+        
+        Args:
+            key: Ticker symbol or other cache key
+            
+        Returns:
+            Cached DataFrame or None on a cache miss
+        """
+        if self.cache_dir is None or not PYARROW_AVAILABLE:
+            return None
+        
+        cache_path = self._cache_path(key)
+        if not cache_path.exists():
+            return None
+        
+        if self._is_open_range():
+            age = datetime.now() - datetime.fromtimestamp(cache_path.stat().st_mtime)
+            if age > timedelta(hours=self.cache_ttl_hours):
+                # Expired entries are never read again; drop them instead of leaving them on disk
+                cache_path.unlink(missing_ok=True)
+                return None
+        
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as e:
+            warnings.warn(f"Failed to read cache for {key}: {str(e)}")
+            return None
+    
+    def _write_cache(self, key: str, data: pd.DataFrame) -> None:
+        """
+        Store data for a cache key on disk.
+        
+        Args:
+            key: Ticker symbol or other cache key
+            data: DataFrame to store
+        """
+        if self.cache_dir is None or not PYARROW_AVAILABLE:
+            return
+        
+        try:
+            self.cache_dir.mkdir(exist_ok=True, parents=True)
+            data.to_parquet(self._cache_path(key), compression='zstd')
+            if self._is_open_range():
+                self._prune_cache(key)
+        except Exception as e:
+            warnings.warn(f"Failed to cache {key}: {str(e)}")
+    
+    def _is_open_range(self) -> bool:
+        """
+        Check whether the date range reaches today, so its data can still change.
+        
+        Returns:
+            True if end_date is today or later
+        """
+        return self.end_date >= datetime.now().strftime("%Y-%m-%d")
+    
+    def _prune_cache(self, key: str) -> None:
+        """
+        Delete cache files for the same key and start date that a newer file supersedes.
+        A default run ends "today", so each day writes a new file name; files whose
+        range was still open when they were written are those stale snapshots.
+        Closed historical ranges (written after their end date) are kept.
+        
+        Args:
+            key: Ticker symbol or other cache key
+        """
+        current = self._cache_path(key)
+        prefix = f"{key}_{self.start_date}_"
+        
+        for path in self.cache_dir.glob(glob.escape(prefix) + "*.parquet"):
+            if path == current:
+                continue
+            end_date = path.stem[len(prefix):]
+            written = datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d")
+            if end_date >= written:
+                path.unlink(missing_ok=True)
+    
+    def _frame_cache_key(self, tickers_dict: Dict[str, str], usd_tickers: List[str]) -> str:
+        """
+        Build the cache key of a processed load_tickers() result.
+        Hashes every input that changes the output frame.
+        
+        Args:
+            tickers_dict: Mapping of display names to ticker symbols
+            usd_tickers: Tickers converted from USD to EUR
+            
+        Returns:
+            Cache key for the processed price frame
+        """
+        request = repr((
+            tuple(tickers_dict.items()),
+            tuple(sorted(usd_tickers)),
+            self.currency_pair,
+            self.dtype
+        ))
+        return "tickers_" + hashlib.blake2b(request.encode(), digest_size=16).hexdigest()
+        
     def _fetch_data(self, ticker: str) -> Optional[pd.DataFrame]:
         """
         Fetch data from Yahoo Finance for a single ticker.
+        Uses Ticker.history rather than yf.download, which keeps module-level
+        state and is not safe to call from several threads at once.
         
         Args:
             ticker: Stock/ETF ticker symbol
@@ -54,22 +194,19 @@ class FactorDataLoader:
             return None
             
         try:
-            data = yf.download(
-                ticker,
+            data = yf.Ticker(ticker).history(
                 start=self.start_date,
                 end=self.end_date,
-                progress=False,
-                auto_adjust=False  # Changed to False to get consistent column structure
+                auto_adjust=False  # Keep 'Adj Close' for a consistent column structure
             )
             
             if data.empty:
                 warnings.warn(f"No data retrieved for {ticker}")
                 return None
             
-            # Handle multi-level columns from yfinance
-            if isinstance(data.columns, pd.MultiIndex):
-                # Drop the ticker level if present
-                data.columns = data.columns.droplevel(1)
+            # Match yf.download, which returns timezone-naive dates
+            if data.index.tz is not None:
+                data.index = data.index.tz_localize(None)
                 
             return data
             
@@ -77,16 +214,88 @@ class FactorDataLoader:
             warnings.warn(f"Failed to fetch {ticker}: {str(e)}")
             return None
     
-    def _load_currency_conversion(self) -> bool:
+    def _fetch_batch(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch data from Yahoo Finance for several tickers in a single request.
+        
+        Args:
+            tickers: Stock/ETF/currency ticker symbols
+            
+        Returns:
+            Dictionary mapping each ticker to its OHLCV DataFrame.
+            Tickers missing from the response are omitted.
+        """
+        if not tickers or not YFINANCE_AVAILABLE:
+            return {}
+            
+        try:
+            data = yf.download(
+                tickers,
+                start=self.start_date,
+                end=self.end_date,
+                group_by='ticker',
+                progress=False,
+                threads=True,
+                auto_adjust=False
+            )
+        except Exception as e:
+            warnings.warn(f"Failed to fetch {', '.join(tickers)}: {str(e)}")
+            return {}
+        
+        if data is None or data.empty:
+            warnings.warn(f"No data retrieved for {', '.join(tickers)}")
+            return {}
+        
+        batch = {}
+        if isinstance(data.columns, pd.MultiIndex):
+            available = set(data.columns.get_level_values(0))
+            for ticker in tickers:
+                if ticker not in available:
+                    continue
+                # Drop dates that only exist for the other tickers in the batch
+                ticker_data = data[ticker].dropna(how='all')
+                if not ticker_data.empty:
+                    batch[ticker] = ticker_data
+        elif len(tickers) == 1:
+            batch[tickers[0]] = data
+            
+        return batch
+    
+    def _fetch_parallel(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch tickers one by one with their network requests overlapped in threads.
+        
+        Args:
+            tickers: Stock/ETF/currency ticker symbols
+            
+        Returns:
+            Dictionary mapping each ticker to its OHLCV DataFrame.
+            Tickers that fail to load are omitted.
+        """
+        if not tickers or not YFINANCE_AVAILABLE:
+            return {}
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(tickers)) as pool:
+            futures = {pool.submit(self._fetch_data, ticker): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                data = future.result()
+                if data is not None:
+                    results[futures[future]] = data
+        
+        return results
+    
+    def _load_currency_conversion(self, currency_data: Optional[pd.DataFrame]) -> bool:
         """
         Load USD/EUR exchange rate for currency conversion.
         Inverts EUR/USD rate to get USD/EUR.
         
+        Args:
+            currency_data: Downloaded EUR/USD OHLCV data, or None if unavailable
+            
         Returns:
             True if successful, False otherwise
         """
-        currency_data = self._fetch_data(self.currency_pair)
-        
         if currency_data is not None and 'Close' in currency_data.columns:
             # Invert EUR/USD to get USD/EUR rate
             self.usd_eur_rate = 1.0 / currency_data['Close']
@@ -117,19 +326,78 @@ class FactorDataLoader:
     
     def load_tickers(self, tickers_dict: Dict[str, str], usd_tickers: List[str]) -> pd.DataFrame:
         """Load and process ticker data with currency conversion to EUR base."""
+        # A repeated request is served from the processed-frame cache, skipping
+        # downloads, currency conversion and alignment entirely
+        frame_key = self._frame_cache_key(tickers_dict, usd_tickers)
+        df = self._read_cache(frame_key)
+        if df is not None:
+            return df
+        
+        df, mock_names = self._load_tickers(tickers_dict, usd_tickers)
+        
+        # Never persist mock fallbacks; the next run should retry the download
+        if not mock_names:
+            self._write_cache(frame_key, df)
+        
+        return df
+    
+    def _load_tickers(
+        self,
+        tickers_dict: Dict[str, str],
+        usd_tickers: List[str]
+    ) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Download (or read per-ticker caches) and process ticker data.
+        
+        Args:
+            tickers_dict: Mapping of display names to ticker symbols
+            usd_tickers: Tickers converted from USD to EUR
+            
+        Returns:
+            Tuple of (price DataFrame, names that fell back to mock data)
+        """
+        # The exchange rate is only needed if some ticker is quoted in USD
+        needs_fx = any(ticker in usd_tickers for ticker in tickers_dict.values())
+        requested = list(tickers_dict.values())
+        if needs_fx:
+            requested.append(self.currency_pair)
+        
+        # Serve whatever we can from the disk cache
+        cached = {}
+        for ticker in requested:
+            data = self._read_cache(ticker)
+            if data is not None:
+                cached[ticker] = data
+        
+        # Fetch the remaining tickers (and currency pair) in one round trip
+        to_fetch = [ticker for ticker in requested if ticker not in cached]
+        batch = self._fetch_batch(to_fetch)
+        
+        # Retry anything the batch request did not return with parallel single-ticker requests
+        missing = [ticker for ticker in to_fetch if ticker not in batch]
+        batch.update(self._fetch_parallel(missing))
+        
+        for ticker, data in batch.items():
+            # Only the price columns are ever read back
+            price_columns = [column for column in ('Adj Close', 'Close') if column in data.columns]
+            self._write_cache(ticker, data[price_columns])
+        batch.update(cached)
+        
         # Load currency conversion rate first
-        self._load_currency_conversion()
+        if needs_fx:
+            self._load_currency_conversion(batch.get(self.currency_pair))
         
         price_data = {}
+        mock_names = []
         
         for name, ticker in tickers_dict.items():
             try:
-                # Fetch data
-                data = self._fetch_data(ticker)
+                # Take this ticker's data from the batch response
+                data = batch.get(ticker)
                 
                 if data is None or data.empty:
                     print(f"Warning: No data for {name} ({ticker}), using mock data")
-                    price_data[name] = self._generate_mock_data(name)
+                    mock_names.append(name)
                     continue
                 
                 # Get adjusted close prices
@@ -139,7 +407,7 @@ class FactorDataLoader:
                     prices = data['Close']
                 else:
                     print(f"Warning: No price column found for {name} ({ticker}), using mock data")
-                    price_data[name] = self._generate_mock_data(name)
+                    mock_names.append(name)
                     continue
                 
                 # Ensure we have a Series, not a DataFrame
@@ -163,39 +431,43 @@ class FactorDataLoader:
             except Exception as e:
                 print(f"Warning: Failed to load {name} ({ticker}): {str(e)}")
                 print(f"Using mock data for {name}")
-                price_data[name] = self._generate_mock_data(name)
+                mock_names.append(name)
                 continue
         
+        # Simulate every ticker that failed to load in one vectorized draw
+        if mock_names:
+            mock_data = self._generate_mock_matrix(mock_names)
+            for name in mock_names:
+                price_data[name] = mock_data[name]
+        
         if not price_data:
             raise ValueError("No ticker data was successfully loaded")
         
-        # Create DataFrame and handle any alignment issues
-        df = pd.DataFrame(price_data)
+        # Create DataFrame (in the requested ticker order) and handle any alignment issues
+        df = pd.DataFrame({name: price_data[name] for name in tickers_dict})
         df = df.dropna(how='all')  # Remove rows where all values are NaN
         
-        return df
+        # Narrow the dtype once here; returns inherit it in get_returns()
+        return df.astype(self.dtype), mock_names
     
-    def _generate_mock_data(self, name: str) -> pd.Series:
+    def _generate_mock_matrix(self, names: List[str]) -> pd.DataFrame:
         """
         Generate realistic mock price data for fallback scenarios.
-        Uses geometric Brownian motion to simulate realistic returns.
+        Uses geometric Brownian motion to simulate realistic returns,
+        drawing all assets from a single random matrix.
         
         Args:
-            name: Name of the asset (for seeding randomness)
+            names: Names of the assets to simulate (also used for seeding)
             
         Returns:
-            Series with simulated price data
+            DataFrame with simulated price data, one column per name
         """
-        # Parse dates (already in ISO format internally)
-        start = datetime.strptime(self.start_date, "%Y-%m-%d")
-        end = datetime.strptime(self.end_date, "%Y-%m-%d")
-        
         # Generate date range (business days)
-        date_range = pd.bdate_range(start=start, end=end)
+        date_range = pd.bdate_range(start=self.start_date, end=self.end_date)
         n_days = len(date_range)
         
-        # Set seed based on name for reproducibility
-        np.random.seed(hash(name) % (2**32))
+        # Seed from the names for reproducibility across runs
+        rng = np.random.default_rng(zlib.crc32(",".join(names).encode()))
         
         # Geometric Brownian Motion parameters
         initial_price = 100.0
@@ -203,21 +475,44 @@ class FactorDataLoader:
         volatility = 0.01  # Daily volatility (~16% annual)
         
         # Generate returns
-        returns = np.random.normal(drift, volatility, n_days)
+        returns = rng.normal(drift, volatility, size=(n_days, len(names)))
         
         # Calculate prices
-        price_series = initial_price * np.exp(np.cumsum(returns))
+        prices = initial_price * np.exp(returns.cumsum(axis=0))
         
-        return pd.Series(price_series, index=date_range, name=name)
+        return pd.DataFrame(prices, index=date_range, columns=names)
     
-    def get_returns(self, prices: pd.DataFrame) -> pd.DataFrame:
+    def get_returns(self, prices: pd.DataFrame, log_returns: bool = False) -> pd.DataFrame:
         """
         Calculate daily returns from price data.
         
+        Simple returns are the default because PerformanceAnalyzer and
+        GeographyAnalyzer compound them with (1 + r).cumprod(); log returns
+        must be converted back with np.expm1 before being passed to them.
+        
         Args:
             prices: DataFrame with price data
+            log_returns: Return log(P_t / P_t-1) instead of simple returns
             
         Returns:
             DataFrame with daily returns
         """
-        return prices.pct_change().dropna()
+        arr = prices.to_numpy()
+        
+        # Gaps are bridged from the last known price, as pct_change() did
+        if np.isnan(arr).any():
+            arr = prices.ffill().to_numpy()
+        
+        if log_returns:
+            log_prices = np.log(arr)
+            returns = log_prices[1:] - log_prices[:-1]
+        else:
+            returns = arr[1:] / arr[:-1] - 1
+        
+        # Keep only dates where every asset has a return
+        complete = ~np.isnan(returns).any(axis=1)
+        return pd.DataFrame(
+            returns[complete],
+            index=prices.index[1:][complete],
+            columns=prices.columns
+        )
@@ -2,10 +2,13 @@
 Geography Analysis Module.
 Analyzes geographic exposure and regional performance metrics.
 """
+from functools import cached_property
 from typing import Dict, Tuple
 import pandas as pd
 import numpy as np
 
+from src.analysis import correlation_matrix, drawdown_array, sample_std
+
 
 class GeographyAnalyzer:
     """
@@ -24,6 +27,23 @@ class GeographyAnalyzer:
         self.prices: pd.DataFrame = prices
         self.returns: pd.DataFrame = returns
         
+        # Inputs are not mutated after construction, so cache the raw arrays and labels once
+        self._prices_np: np.ndarray = prices.to_numpy(copy=False)
+        self._returns_np: np.ndarray = returns.to_numpy(copy=False)
+        self._columns: pd.Index = prices.columns
+        
+    @cached_property
+    def total_return(self) -> pd.Series:
+        """
+        Total return of each region over the whole period (as decimals).
+        Computed once and shared by every method that needs it.
+        
+        Returns:
+            Series with total returns
+        """
+        prices = self._prices_np
+        return pd.Series(prices[-1] / prices[0] - 1, index=self._columns)
+    
     def calculate_relative_performance(self) -> pd.DataFrame:
         """
         Calculate cumulative performance relative to a base of 100.
@@ -31,8 +51,20 @@ class GeographyAnalyzer:
         Returns:
             DataFrame with normalized performance (base 100)
         """
-        normalized = (self.prices / self.prices.iloc[0]) * 100
-        return normalized
+        prices = self._prices_np
+        normalized = prices / prices[0:1] * 100
+        return pd.DataFrame(normalized, index=self.prices.index, columns=self._columns)
+    
+    def calculate_cumulative_returns(self) -> pd.DataFrame:
+        """
+        Calculate cumulative returns for all regions.
+        
+        Returns:
+            DataFrame with cumulative returns (as decimals, not percentages)
+        """
+        prices = self._prices_np
+        cumulative_returns = prices / prices[0:1] - 1
+        return pd.DataFrame(cumulative_returns, index=self.prices.index, columns=self._columns)
     
     def calculate_regional_correlations(self) -> pd.DataFrame:
         """
@@ -41,7 +73,7 @@ class GeographyAnalyzer:
         Returns:
             DataFrame with pairwise correlations
         """
-        return self.returns.corr()
+        return correlation_matrix(self._returns_np, self._columns)
     
     def calculate_regional_contribution(self) -> pd.Series:
         """
@@ -51,11 +83,11 @@ class GeographyAnalyzer:
         Returns:
             Series with percentage allocations
         """
-        final_values = self.prices.iloc[-1]
-        total_value = final_values.sum()
+        final_values = self._prices_np[-1]
+        total_value = np.nansum(final_values)
         contributions = (final_values / total_value) * 100
         
-        return contributions
+        return pd.Series(contributions, index=self._columns)
     
     def get_best_worst_performers(self) -> Dict[str, str]:
         """
@@ -64,16 +96,17 @@ class GeographyAnalyzer:
         Returns:
             Dictionary with 'best' and 'worst' region names
         """
-        total_returns = (self.prices.iloc[-1] / self.prices.iloc[0] - 1) * 100
+        total_returns = self.total_return.to_numpy() * 100
         
-        best_region = total_returns.idxmax()
-        worst_region = total_returns.idxmin()
+        # NaN-skipping positional lookups, matching idxmax/idxmin
+        best = np.nanargmax(total_returns)
+        worst = np.nanargmin(total_returns)
         
         return {
-            'best': best_region,
-            'best_return': total_returns[best_region],
-            'worst': worst_region,
-            'worst_return': total_returns[worst_region]
+            'best': self._columns[best],
+            'best_return': total_returns[best],
+            'worst': self._columns[worst],
+            'worst_return': total_returns[worst]
         }
     
     def calculate_regional_volatility(self, annualization_factor: int = 252) -> pd.Series:
@@ -86,7 +119,8 @@ class GeographyAnalyzer:
         Returns:
             Series with annualized volatilities
         """
-        return self.returns.std() * np.sqrt(annualization_factor)
+        volatility = sample_std(self._returns_np) * np.sqrt(annualization_factor)
+        return pd.Series(volatility, index=self._columns)
     
     def calculate_risk_adjusted_returns(
         self,
@@ -104,12 +138,11 @@ class GeographyAnalyzer:
             DataFrame with risk-adjusted metrics
         """
         # Calculate annualized returns
-        n_years = len(self.returns) / trading_days
-        total_return = (self.prices.iloc[-1] / self.prices.iloc[0]) - 1
-        annualized_return = (1 + total_return) ** (1 / n_years) - 1
+        n_years = len(self._returns_np) / trading_days
+        annualized_return = (1 + self.total_return) ** (1 / n_years) - 1
         
         # Calculate annualized volatility
-        annualized_vol = self.returns.std() * np.sqrt(trading_days)
+        annualized_vol = self.calculate_regional_volatility(trading_days)
         
         # Calculate Sharpe ratio
         sharpe = (annualized_return - risk_free_rate) / annualized_vol
@@ -123,28 +156,29 @@ class GeographyAnalyzer:
         
         return risk_adjusted
     
-    def analyze_drawdown_by_region(self) -> pd.DataFrame:
+    def calculate_drawdowns(self) -> pd.DataFrame:
         """
-        Calculate maximum drawdown for each geographic region.
+        Calculate drawdown series for each geographic region.
+        Drawdown = (Current Price - Peak Price) / Peak Price
         
         Returns:
-            DataFrame with drawdown analysis
+            DataFrame with drawdown values (negative percentages)
+        """
+        drawdowns = drawdown_array(self._prices_np)
+        return pd.DataFrame(drawdowns, index=self.prices.index, columns=self._columns)
+    
+    def analyze_drawdown_by_region(self) -> pd.Series:
         """
-        drawdowns = pd.DataFrame(index=self.prices.index)
-        max_drawdowns = {}
+        Calculate maximum drawdown for each geographic region.
         
-        for region in self.prices.columns:
-            # Calculate running maximum
-            running_max = self.prices[region].expanding().max()
-            
-            # Calculate drawdown
-            drawdown = (self.prices[region] - running_max) / running_max
-            drawdowns[region] = drawdown
-            
-            # Store maximum drawdown
-            max_drawdowns[region] = drawdown.min()
+        Returns:
+            Series with maximum drawdown values
+        """
+        # Reduce straight to the minimum; the drawdown frame is never built here
+        drawdowns = drawdown_array(self._prices_np)
+        max_drawdowns = np.nanmin(drawdowns, axis=0)
         
-        return pd.Series(max_drawdowns, name='Max Drawdown')
+        return pd.Series(max_drawdowns, index=self._columns, name='Max Drawdown')
     
     def get_geographic_summary(
         self,
@@ -161,21 +195,21 @@ class GeographyAnalyzer:
         Returns:
             DataFrame with all key geographic metrics
         """
-        # Calculate metrics
-        total_return = (self.prices.iloc[-1] / self.prices.iloc[0] - 1) * 100
+        # Total return is cached and shared with calculate_risk_adjusted_returns
         risk_adjusted = self.calculate_risk_adjusted_returns(risk_free_rate, trading_days)
         max_dd = self.analyze_drawdown_by_region()
         
         # Combine into summary
         summary = pd.DataFrame({
-            'Total Return (%)': total_return,
+            'Total Return (%)': self.total_return * 100,
             'Annualized Return (%)': risk_adjusted['Annualized Return'] * 100,
             'Annualized Volatility (%)': risk_adjusted['Annualized Volatility'] * 100,
             'Sharpe Ratio': risk_adjusted['Sharpe Ratio'],
             'Max Drawdown (%)': max_dd * 100
         })
         
-        return summary
+        # Report in full precision even when the inputs are float32
+        return summary.astype(np.float64)
     
     def calculate_diversification_ratio(self) -> float:
         """
@@ -185,20 +219,27 @@ class GeographyAnalyzer:
         Returns:
             Diversification ratio (weighted avg volatility / portfolio volatility)
         """
+        returns = self._returns_np
+        n_assets = returns.shape[1]
+        
         # Equal weight portfolio
-        weights = np.array([1.0 / len(self.returns.columns)] * len(self.returns.columns))
+        weights = np.full(n_assets, 1.0 / n_assets)
         
         # Individual volatilities
-        individual_vols = self.returns.std().values
+        individual_vols = sample_std(returns)
+        
+        # Missing returns contribute nothing to the portfolio, as in a NaN-skipping sum
+        if np.isnan(returns).any():
+            returns = np.where(np.isnan(returns), 0.0, returns)
         
-        # Portfolio returns
-        portfolio_returns = (self.returns * weights).sum(axis=1)
-        portfolio_vol = portfolio_returns.std()
+        # Portfolio returns (contracted directly, no T x N weighted intermediate)
+        portfolio_returns = np.einsum('tn,n->t', returns, weights)
+        portfolio_vol = portfolio_returns.std(ddof=1)
         
         # Weighted average of individual volatilities
-        weighted_avg_vol = np.dot(weights, individual_vols)
+        weighted_avg_vol = np.einsum('n,n->', weights, individual_vols)
         
-        # Diversification ratio
+        # Diversification ratio, reported in full precision even when the inputs are float32
         div_ratio = weighted_avg_vol / portfolio_vol
         
-        return div_ratio
+        return float(div_ratio)
@@ -2,10 +2,13 @@
 Main Entry Point for Factor Investing Analyzer.
 Orchestrates the complete analysis pipeline.
 """
+import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -16,6 +19,34 @@ from src.analysis import PerformanceAnalyzer
 from src.geography import GeographyAnalyzer
 from src.visualizer import Visualizer
 
+# Visualizer of a rendering worker process, built once by _init_render_worker()
+_worker_visualizer: Optional[Visualizer] = None
+
+
+def _init_render_worker(visualizer_kwargs: Dict, rc_params: dict) -> None:
+    """
+    Build the worker's Visualizer once, so every chart the worker renders reuses its figures.
+    
+    Args:
+        visualizer_kwargs: Constructor arguments of the parent process's Visualizer
+        rc_params: Theme rcParams already resolved by the parent process
+    """
+    global _worker_visualizer
+    Visualizer.register_theme(visualizer_kwargs['theme'], rc_params)
+    _worker_visualizer = Visualizer(**visualizer_kwargs)
+
+
+def _render_chart(method: str, args: Tuple, kwargs: Dict) -> None:
+    """
+    Render one chart with the worker's Visualizer.
+    
+    Args:
+        method: Name of the Visualizer plot method
+        args: Positional arguments for the plot method
+        kwargs: Keyword arguments for the plot method
+    """
+    getattr(_worker_visualizer, method)(*args, **kwargs)
+
 
 class FactorInvestingAnalyzer:
     """
@@ -23,12 +54,12 @@ class FactorInvestingAnalyzer:
     Coordinates data loading, analysis, and visualization.
     """
     
-    def __init__(self, start_date: str = None, end_date: str = None):
+    def __init__(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
         """Initialize the analyzer with configuration settings.
         
         Args:
-            start_date: Optional start date (DD/MM/YYYY). Defaults to 01/01/2000.
-            end_date: Optional end date (DD/MM/YYYY). Defaults to today.
+            start_date: Optional start date. Defaults to 01/01/2000.
+            end_date: Optional end date. Defaults to today.
         """
         self.config = Config()
         self.config.ensure_directories()
@@ -43,15 +74,25 @@ class FactorInvestingAnalyzer:
         self.data_loader = FactorDataLoader(
             start_date=self.config.START_DATE,
             end_date=self.config.END_DATE,
-            currency_pair=self.config.CURRENCY_PAIR
+            currency_pair=self.config.CURRENCY_PAIR,
+            cache_dir=self.config.DATA_DIR,
+            cache_ttl_hours=self.config.CACHE_TTL_HOURS,
+            dtype=self.config.DATA_DTYPE
         )
         
-        self.visualizer = Visualizer(
+        # Kept so rendering workers can build an identical Visualizer
+        self.visualizer_kwargs: Dict = dict(
             output_dir=self.config.OUTPUT_DIR,
             theme=self.config.PLOT_THEME,
             figsize=self.config.FIGURE_SIZE,
-            dpi=self.config.DPI
+            dpi=self.config.DPI,
+            dpi_raster=self.config.RASTER_DPI,
+            compress_level=self.config.PNG_COMPRESS_LEVEL
         )
+        self.visualizer = Visualizer(**self.visualizer_kwargs)
+        
+        # Rendering worker pool, created on first use and shared by every analysis step
+        self._render_pool: Optional[ProcessPoolExecutor] = None
         
         # Data containers
         self.factor_prices = None
@@ -61,33 +102,27 @@ class FactorInvestingAnalyzer:
         
     def load_data(self) -> None:
         """Load all factor and geography data."""
-        print("=" * 70)
-        print("LOADING DATA")
-        print("=" * 70)
-        
-        # Load factor data
-        print("\nLoading Factor ETF data...")
-        self.factor_prices = self.data_loader.load_tickers(
-            tickers_dict=self.config.FACTOR_TICKERS,
+        self._print_header("LOADING DATA", leading_blank=False)
+        
+        # Load factor and geography tickers together in a single network fetch
+        print("\nLoading Factor and Geography ETF data...")
+        combined_prices = self.data_loader.load_tickers(
+            tickers_dict={**self.config.FACTOR_TICKERS, **self.config.GEOGRAPHY_TICKERS},
             usd_tickers=self.config.USD_TICKERS
         )
+        
+        # Split by column set; drop dates that only exist for the other group
+        self.factor_prices = combined_prices[list(self.config.FACTOR_TICKERS)].dropna(how='all')
         self.factor_returns = self.data_loader.get_returns(self.factor_prices)
         print(f"Factor data loaded: {len(self.factor_prices)} days, {len(self.factor_prices.columns)} factors")
         
-        # Load geography data
-        print("\nLoading Geography ETF data...")
-        self.geography_prices = self.data_loader.load_tickers(
-            tickers_dict=self.config.GEOGRAPHY_TICKERS,
-            usd_tickers=self.config.USD_TICKERS
-        )
+        self.geography_prices = combined_prices[list(self.config.GEOGRAPHY_TICKERS)].dropna(how='all')
         self.geography_returns = self.data_loader.get_returns(self.geography_prices)
         print(f"Geography data loaded: {len(self.geography_prices)} days, {len(self.geography_prices.columns)} regions")
         
     def analyze_factors(self) -> None:
         """Perform comprehensive factor analysis."""
-        print("\n" + "=" * 70)
-        print("FACTOR ANALYSIS")
-        print("=" * 70)
+        self._print_header("FACTOR ANALYSIS")
         
         # Initialize analyzer
         factor_analyzer = PerformanceAnalyzer(self.factor_returns)
@@ -102,11 +137,8 @@ class FactorInvestingAnalyzer:
         print("\n--- Factor Performance Summary ---")
         print(performance_summary.to_string())
         
-        # Calculate cumulative returns
-        cumulative_returns = factor_analyzer.calculate_cumulative_returns()
-        
-        # Calculate drawdowns
-        drawdowns = factor_analyzer.calculate_drawdowns()
+        # Calculate cumulative returns and drawdowns
+        cumulative_returns, drawdowns = factor_analyzer.calculate_cumulative_and_drawdowns()
         
         # Calculate correlations
         correlation_matrix = factor_analyzer.calculate_correlation_matrix()
@@ -117,44 +149,36 @@ class FactorInvestingAnalyzer:
         # Generate visualizations
         print("\nGenerating factor visualizations...")
         
-        self.visualizer.plot_cumulative_returns(
-            cumulative_returns,
-            title="Factor Performance - Cumulative Returns",
-            filename="factor_cumulative_returns.png"
-        )
-        
-        self.visualizer.plot_drawdowns(
-            drawdowns,
-            title="Factor Drawdown Analysis",
-            filename="factor_drawdowns.png"
-        )
-        
-        self.visualizer.plot_correlation_matrix(
-            correlation_matrix,
-            title="Factor Correlation Matrix",
-            filename="factor_correlation_matrix.png"
-        )
-        
-        self.visualizer.plot_performance_summary(
-            performance_summary,
-            title="Factor Performance Metrics",
-            filename="factor_performance_summary.png"
-        )
-        
         # Plot Sharpe ratios comparison
         sharpe_ratios = performance_summary['Sharpe Ratio']
-        self.visualizer.plot_comparison_bars(
-            sharpe_ratios,
-            title="Factor Sharpe Ratios Comparison",
-            ylabel="Sharpe Ratio",
-            filename="factor_sharpe_comparison.png"
-        )
+        
+        self._render([
+            ('plot_cumulative_returns', (cumulative_returns,), {
+                'title': "Factor Performance - Cumulative Returns",
+                'filename': "factor_cumulative_returns.png"
+            }),
+            ('plot_drawdowns', (drawdowns,), {
+                'title': "Factor Drawdown Analysis",
+                'filename': "factor_drawdowns.png"
+            }),
+            ('plot_correlation_matrix', (correlation_matrix,), {
+                'title': "Factor Correlation Matrix",
+                'filename': "factor_correlation_matrix.png"
+            }),
+            ('plot_performance_summary', (performance_summary,), {
+                'title': "Factor Performance Metrics",
+                'filename': "factor_performance_summary.png"
+            }),
+            ('plot_comparison_bars', (sharpe_ratios,), {
+                'title': "Factor Sharpe Ratios Comparison",
+                'ylabel': "Sharpe Ratio",
+                'filename': "factor_sharpe_comparison.png"
+            })
+        ])
         
     def analyze_geography(self) -> None:
         """Perform comprehensive geographic analysis."""
-        print("\n" + "=" * 70)
-        print("GEOGRAPHIC ANALYSIS")
-        print("=" * 70)
+        self._print_header("GEOGRAPHIC ANALYSIS")
         
         # Initialize analyzer
         geo_analyzer = GeographyAnalyzer(self.geography_prices, self.geography_returns)
@@ -187,47 +211,91 @@ class FactorInvestingAnalyzer:
         # Generate visualizations
         print("\nGenerating geographic visualizations...")
         
-        # Cumulative performance
-        relative_performance = geo_analyzer.calculate_relative_performance()
-        self.visualizer.plot_cumulative_returns(
-            (relative_performance / 100) - 1,  # Convert back to returns format
-            title="Geographic Performance - Normalized (Base 100)",
-            filename="geography_performance.png"
-        )
-        
-        # Regional allocation pie chart
+        cumulative_returns = geo_analyzer.calculate_cumulative_returns()
         regional_contribution = geo_analyzer.calculate_regional_contribution()
-        self.visualizer.plot_pie_chart(
-            regional_contribution,
-            title="Regional Allocation",
-            filename="geography_allocation_pie.png"
-        )
+        sharpe_ratios = geographic_summary['Sharpe Ratio']
         
-        # Correlation matrix
-        self.visualizer.plot_correlation_matrix(
-            regional_correlations,
-            title="Regional Correlation Matrix",
-            filename="geography_correlation_matrix.png"
-        )
+        self._render([
+            # Cumulative performance
+            ('plot_cumulative_returns', (cumulative_returns,), {
+                'title': "Geographic Performance - Normalized (Base 100)",
+                'filename': "geography_performance.png"
+            }),
+            # Regional allocation pie chart
+            ('plot_pie_chart', (regional_contribution,), {
+                'title': "Regional Allocation",
+                'filename': "geography_allocation_pie.png"
+            }),
+            # Correlation matrix
+            ('plot_correlation_matrix', (regional_correlations,), {
+                'title': "Regional Correlation Matrix",
+                'filename': "geography_correlation_matrix.png"
+            }),
+            # Sharpe ratio comparison
+            ('plot_comparison_bars', (sharpe_ratios,), {
+                'title': "Regional Sharpe Ratios",
+                'ylabel': "Sharpe Ratio",
+                'filename': "geography_sharpe_comparison.png"
+            })
+        ])
+    
+    @staticmethod
+    def _print_header(title: str, *details: str, leading_blank: bool = True) -> None:
+        """
+        Print a section banner with a single write.
         
-        # Sharpe ratio comparison
-        sharpe_ratios = geographic_summary['Sharpe Ratio']
-        self.visualizer.plot_comparison_bars(
-            sharpe_ratios,
-            title="Regional Sharpe Ratios",
-            ylabel="Sharpe Ratio",
-            filename="geography_sharpe_comparison.png"
-        )
+        Args:
+            title: Section title shown between the rules
+            details: Extra lines shown in their own ruled block under the title
+            leading_blank: Start with an empty line to separate sections
+        """
+        rule = "=" * 70
+        lines = [rule, title, rule]
+        if details:
+            lines += [*details, rule]
+        print(("\n" if leading_blank else "") + "\n".join(lines))
+    
+    def _render(self, jobs: List[Tuple[str, Tuple, Dict]]) -> None:
+        """
+        Render independent charts in parallel worker processes.
+        Matplotlib figures are not thread-safe, but each process renders with its own Agg canvas.
+        
+        Args:
+            jobs: (Visualizer plot method name, positional args, keyword args) for each chart
+        """
+        # Flush pending output so forked workers don't inherit and repeat it
+        sys.stdout.flush()
+        
+        # The pool outlives this call, so each worker's Visualizer reuses its figures
+        # across analysis steps; size it by the first batch of charts
+        if self._render_pool is None:
+            self._render_pool = ProcessPoolExecutor(
+                max_workers=min(len(jobs), os.cpu_count() or 1),
+                initializer=_init_render_worker,
+                initargs=(self.visualizer_kwargs, self.visualizer.rc_params)
+            )
+        
+        futures = [self._render_pool.submit(_render_chart, *job) for job in jobs]
+        
+        # Each worker reports its file as it is saved; surface any rendering error here
+        for future in as_completed(futures):
+            future.result()
+    
+    def _shutdown_render_pool(self) -> None:
+        """Stop the rendering worker processes, if any were started."""
+        if self._render_pool is not None:
+            self._render_pool.shutdown()
+            self._render_pool = None
         
     def run(self) -> None:
         """Execute the complete analysis pipeline."""
         try:
-            print("\n" + "=" * 70)
-            print("FACTOR INVESTING ANALYZER")
-            print("=" * 70)
-            print(f"Analysis Period: {self.config.START_DATE} to {self.config.END_DATE}")
-            print(f"Risk-Free Rate: {self.config.RISK_FREE_RATE * 100:.1f}%")
-            print("=" * 70)
+            self._print_header(
+                "FACTOR INVESTING ANALYZER",
+                f"Analysis Period: {self.config.START_DATE.strftime('%d/%m/%Y')} "
+                f"to {self.config.END_DATE.strftime('%d/%m/%Y')}",
+                f"Risk-Free Rate: {self.config.RISK_FREE_RATE * 100:.1f}%"
+            )
             
             # Step 1: Load data
             self.load_data()
@@ -239,27 +307,29 @@ class FactorInvestingAnalyzer:
             self.analyze_geography()
             
             # Completion message
-            print("\n" + "=" * 70)
-            print("ANALYSIS COMPLETE")
-            print("=" * 70)
-            print(f"\nAll outputs saved to: {self.config.OUTPUT_DIR}")
-            print("\nGenerated Files:")
-            print("  - Factor cumulative returns chart")
-            print("  - Factor drawdown analysis")
-            print("  - Factor correlation matrix")
-            print("  - Factor performance summary")
-            print("  - Factor Sharpe ratio comparison")
-            print("  - Geographic performance chart")
-            print("  - Geographic allocation pie chart")
-            print("  - Geographic correlation matrix")
-            print("  - Geographic Sharpe ratio comparison")
-            print("\n" + "=" * 70)
+            self._print_header("ANALYSIS COMPLETE")
+            print(
+                f"\nAll outputs saved to: {self.config.OUTPUT_DIR}\n"
+                "\nGenerated Files:\n"
+                "  - Factor cumulative returns chart\n"
+                "  - Factor drawdown analysis\n"
+                "  - Factor correlation matrix\n"
+                "  - Factor performance summary\n"
+                "  - Factor Sharpe ratio comparison\n"
+                "  - Geographic performance chart\n"
+                "  - Geographic allocation pie chart\n"
+                "  - Geographic correlation matrix\n"
+                "  - Geographic Sharpe ratio comparison\n"
+                "\n" + "=" * 70
+            )
             
         except Exception as e:
             print(f"\nERROR: Analysis failed with exception: {str(e)}")
             import traceback
             traceback.print_exc()
             sys.exit(1)
+        finally:
+            self._shutdown_render_pool()
 
 
 def parse_arguments():
@@ -298,19 +368,18 @@ Note: All returns are calculated in EUR (base currency).
     return parser.parse_args()
 
 
-def validate_date(date_string: str, param_name: str) -> bool:
-    """Validate date format.
+def parse_date(date_string: str, param_name: str) -> datetime:
+    """Parse and validate a DD/MM/YYYY date.
     
     Args:
-        date_string: Date string to validate
+        date_string: Date string to parse
         param_name: Parameter name for error messages
         
     Returns:
-        True if valid, exits program if invalid
+        Parsed date, exits program if invalid
     """
     try:
-        datetime.strptime(date_string, "%d/%m/%Y")
-        return True
+        return datetime.strptime(date_string, "%d/%m/%Y")
     except ValueError:
         print(f"ERROR: Invalid {param_name} format. Please use DD/MM/YYYY format.")
         print(f"Example: 15/01/2020")
@@ -321,24 +390,19 @@ def main():
     """Main entry point with argument parsing."""
     args = parse_arguments()
     
-    # Validate dates if provided
-    if args.start_date:
-        validate_date(args.start_date, "start date")
-    if args.end_date:
-        validate_date(args.end_date, "end date")
+    # Parse (and validate) dates once if provided
+    start = parse_date(args.start_date, "start date") if args.start_date else None
+    end = parse_date(args.end_date, "end date") if args.end_date else None
     
     # Validate date order if both provided
-    if args.start_date and args.end_date:
-        start = datetime.strptime(args.start_date, "%d/%m/%Y")
-        end = datetime.strptime(args.end_date, "%d/%m/%Y")
-        if start >= end:
-            print("ERROR: Start date must be before end date.")
-            sys.exit(1)
+    if start and end and start >= end:
+        print("ERROR: Start date must be before end date.")
+        sys.exit(1)
     
     # Create and run analyzer with provided dates
     analyzer = FactorInvestingAnalyzer(
-        start_date=args.start_date,
-        end_date=args.end_date
+        start_date=start,
+        end_date=end
     )
     analyzer.run()
 
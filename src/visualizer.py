@@ -2,12 +2,16 @@
 Visualization Module.
 Creates professional charts using matplotlib with matplotx github dark theme.
 """
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen; charts are only saved to disk
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib.figure import Figure
 
 try:
     import matplotx
@@ -17,18 +21,43 @@ except ImportError:
     print("Warning: matplotx not available. Using default matplotlib style.")
 
 
+@lru_cache(maxsize=64)
+def _palette(name: str, n: int, lo: float, hi: float) -> np.ndarray:
+    """
+    Sample n evenly spaced RGBA colors from a matplotlib colormap.
+    
+    Args:
+        name: Colormap name (e.g. 'viridis')
+        n: Number of colors
+        lo: Start of the sampled range in [0, 1]
+        hi: End of the sampled range in [0, 1]
+        
+    Returns:
+        Read-only (n, 4) float32 array of RGBA colors, shared between calls
+    """
+    # float32 is far finer than the 8-bit channels the PNG stores
+    colors = getattr(plt.cm, name)(np.linspace(lo, hi, n)).astype(np.float32)
+    colors.flags.writeable = False
+    return colors
+
+
 class Visualizer:
     """
     Creates and saves publication-quality visualizations.
     Applies matplotx github dark theme for consistent styling.
     """
     
+    # Resolved rcParams per theme, shared by every instance in the process
+    _rc_cache: Dict[str, dict] = {}
+    
     def __init__(
         self,
         output_dir: Path,
         theme: str = "dark",
         figsize: Tuple[int, int] = (12, 8),
-        dpi: int = 300
+        dpi: int = 300,
+        dpi_raster: int = 150,
+        compress_level: int = 1
     ):
         """
         Initialize the visualizer with style settings.
@@ -37,12 +66,19 @@ class Visualizer:
             output_dir: Directory to save plots
             theme: Theme name ('dark' or 'light')
             figsize: Figure size in inches (width, height)
-            dpi: Resolution for saved images
+            dpi: Resolution for detail-heavy charts (heatmaps)
+            dpi_raster: Resolution for line, bar and pie charts
+            compress_level: PNG zlib compression level (0-9)
         """
         self.output_dir: Path = Path(output_dir)
         self.theme: str = theme
         self.figsize: Tuple[int, int] = figsize
         self.dpi: int = dpi
+        self.dpi_raster: int = dpi_raster
+        self.compress_level: int = compress_level
+        
+        # Reusable figure per figsize; kept per instance so no two instances draw on one Figure
+        self._figures: Dict[Tuple[float, float], Figure] = {}
         
         # Ensure output directory exists
         self.output_dir.mkdir(exist_ok=True, parents=True)
@@ -50,16 +86,81 @@ class Visualizer:
         # Apply theme
         self._apply_theme()
     
+    @property
+    def rc_params(self) -> dict:
+        """Resolved rcParams for the current theme (resolved once per theme)."""
+        rc = self._rc_cache.get(self.theme)
+        if rc is None:
+            rc = self._resolve_rc()
+            Visualizer._rc_cache[self.theme] = rc
+        return rc
+    
+    @classmethod
+    def register_theme(cls, theme: str, rc: dict) -> None:
+        """
+        Register already-resolved rcParams for a theme, e.g. in a worker process,
+        so instances using that theme skip resolving the style again.
+        
+        Args:
+            theme: Theme name ('dark' or 'light')
+            rc: Resolved rcParams for the theme
+        """
+        cls._rc_cache[theme] = rc
+    
+    @staticmethod
+    def apply_rc_params(rc: dict) -> None:
+        """
+        Apply a resolved rcParams dict in one update.
+        
+        Args:
+            rc: rcParams to apply
+        """
+        matplotlib.rcParams.update(rc)
+    
     def _apply_theme(self) -> None:
         """Apply matplotx github theme if available."""
+        self.apply_rc_params(self.rc_params)
+    
+    def _resolve_rc(self) -> dict:
+        """
+        Resolve the rcParams for the current theme.
+        
+        Returns:
+            matplotx style dict, or the parameters of a built-in fallback style
+        """
         if MATPLOTX_AVAILABLE:
             try:
-                plt.style.use(matplotx.styles.github[self.theme])
+                return dict(matplotx.styles.github[self.theme])
             except Exception as e:
                 print(f"Warning: Could not apply matplotx theme. Using default. Error: {e}")
-                plt.style.use('dark_background' if self.theme == 'dark' else 'default')
-        else:
+        
+        # Let matplotlib resolve the fallback style once, then keep the resulting parameters
+        with matplotlib.rc_context():
             plt.style.use('dark_background' if self.theme == 'dark' else 'default')
+            rc = dict(matplotlib.rcParams)
+        rc.pop('backend', None)
+        return rc
+    
+    def _get_fig(self, figsize: Tuple[float, float]) -> Figure:
+        """
+        Get a cleared figure of the given size, creating it on first use.
+        The figure is not registered with pyplot; it is released with the instance.
+        
+        Args:
+            figsize: Figure size in inches (width, height)
+            
+        Returns:
+            Empty matplotlib Figure
+        """
+        key = tuple(figsize)
+        fig = self._figures.get(key)
+        if fig is None:
+            fig = Figure(figsize=figsize)
+            self._figures[key] = fig
+        else:
+            fig.clf()
+        
+        return fig
     
     def plot_cumulative_returns(
         self,
@@ -75,30 +176,30 @@ class Visualizer:
             title: Chart title
             filename: Output filename
         """
-        fig, ax = plt.subplots(figsize=self.figsize)
-        
-        # Plot each series
-        for column in cumulative_returns.columns:
-            ax.plot(
-                cumulative_returns.index,
-                cumulative_returns[column] * 100,
-                label=column,
-                linewidth=2
-            )
+        fig = self._get_fig(self.figsize)
+        ax = fig.add_subplot()
+        
+        # Plot all series in one call (one line per column). rasterized only matters for
+        # vector filenames (e.g. .pdf): the lines become a dpi_raster image, text stays vector
+        lines = ax.plot(
+            cumulative_returns.index,
+            cumulative_returns.to_numpy() * 100,
+            linewidth=2,
+            rasterized=True
+        )
         
         # Formatting
         ax.set_xlabel('Date', fontsize=12)
         ax.set_ylabel('Cumulative Return (%)', fontsize=12)
         ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-        ax.legend(loc='best', frameon=True, fontsize=10)
+        ax.legend(lines, list(cumulative_returns.columns), loc='best', frameon=True, fontsize=10)
         ax.grid(True, alpha=0.3, linestyle='--')
         
         # Add zero line
         ax.axhline(y=0, color='gray', linestyle='-', linewidth=0.8, alpha=0.5)
         
-        plt.tight_layout()
+        fig.tight_layout()
         self._save_figure(fig, filename)
-        plt.close(fig)
     
     def plot_drawdowns(
         self,
@@ -114,23 +215,25 @@ class Visualizer:
             title: Chart title
             filename: Output filename
         """
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig = self._get_fig(self.figsize)
+        ax = fig.add_subplot()
+        
+        values = drawdowns.to_numpy() * 100
         
-        # Plot each series
-        for column in drawdowns.columns:
+        # Shade each series (fills carry the legend labels); rasterized as above
+        for idx, column in enumerate(drawdowns.columns):
             ax.fill_between(
                 drawdowns.index,
-                drawdowns[column] * 100,
+                values[:, idx],
                 0,
                 alpha=0.3,
-                label=column
-            )
-            ax.plot(
-                drawdowns.index,
-                drawdowns[column] * 100,
-                linewidth=1.5
+                label=column,
+                rasterized=True
             )
         
+        # Outline all series in one call (one line per column)
+        ax.plot(drawdowns.index, values, linewidth=1.5, rasterized=True)
+        
         # Formatting
         ax.set_xlabel('Date', fontsize=12)
         ax.set_ylabel('Drawdown (%)', fontsize=12)
@@ -138,9 +241,8 @@ class Visualizer:
         ax.legend(loc='lower left', frameon=True, fontsize=10)
         ax.grid(True, alpha=0.3, linestyle='--')
         
-        plt.tight_layout()
+        fig.tight_layout()
         self._save_figure(fig, filename)
-        plt.close(fig)
     
     def plot_correlation_matrix(
         self,
@@ -156,38 +258,41 @@ class Visualizer:
             title: Chart title
             filename: Output filename
         """
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig = self._get_fig((10, 8))
+        ax = fig.add_subplot()
+        
+        values = correlation_matrix.to_numpy()
+        n_rows, n_cols = values.shape
         
         # Create heatmap
-        im = ax.imshow(correlation_matrix, cmap='RdYlGn', aspect='auto', vmin=-1, vmax=1)
+        im = ax.imshow(values, cmap='RdYlGn', aspect='auto', vmin=-1, vmax=1)
         
         # Set ticks and labels
-        ax.set_xticks(np.arange(len(correlation_matrix.columns)))
-        ax.set_yticks(np.arange(len(correlation_matrix.index)))
+        ax.set_xticks(np.arange(n_cols))
+        ax.set_yticks(np.arange(n_rows))
         ax.set_xticklabels(correlation_matrix.columns, rotation=45, ha='right')
         ax.set_yticklabels(correlation_matrix.index)
         
-        # Add correlation values as text
-        for i in range(len(correlation_matrix.index)):
-            for j in range(len(correlation_matrix.columns)):
-                value = correlation_matrix.iloc[i, j]
-                text = ax.text(
-                    j, i, f'{value:.2f}',
+        # Add correlation values as text, grouping cells by label color with one vectorized mask
+        dark_text = np.abs(values) > 0.5
+        for mask, color in ((dark_text, 'black'), (~dark_text, 'white')):
+            for i, j in np.argwhere(mask):
+                ax.text(
+                    j, i, f'{values[i, j]:.2f}',
                     ha='center', va='center',
-                    color='black' if abs(value) > 0.5 else 'white',
+                    color=color,
                     fontsize=10, fontweight='bold'
                 )
         
         # Add colorbar
-        cbar = plt.colorbar(im, ax=ax)
+        cbar = fig.colorbar(im, ax=ax)
         cbar.set_label('Correlation', rotation=270, labelpad=20, fontsize=12)
         
         # Formatting
         ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
         
-        plt.tight_layout()
-        self._save_figure(fig, filename)
-        plt.close(fig)
+        fig.tight_layout()
+        self._save_figure(fig, filename, high_res=True)
     
     def plot_performance_summary(
         self,
@@ -218,7 +323,8 @@ class Visualizer:
             return
         
         n_metrics = len(available_metrics)
-        fig, axes = plt.subplots(1, n_metrics, figsize=(6 * n_metrics, 6))
+        fig = self._get_fig((6 * n_metrics, 6))
+        axes = fig.subplots(1, n_metrics)
         
         if n_metrics == 1:
             axes = [axes]
@@ -230,7 +336,7 @@ class Visualizer:
             bars = ax.bar(range(len(data)), data, alpha=0.8)
             
             # Color bars
-            colors = plt.cm.viridis(np.linspace(0.3, 0.9, len(data)))
+            colors = _palette('viridis', len(data), 0.3, 0.9)
             for bar, color in zip(bars, colors):
                 bar.set_color(color)
             
@@ -242,18 +348,11 @@ class Visualizer:
             ax.grid(True, alpha=0.3, axis='y', linestyle='--')
             
             # Add value labels on bars
-            for i, (bar, value) in enumerate(zip(bars, data)):
-                height = bar.get_height()
-                ax.text(
-                    bar.get_x() + bar.get_width() / 2., height,
-                    f'{value:.2f}',
-                    ha='center', va='bottom', fontsize=9
-                )
+            ax.bar_label(bars, labels=[f'{v:.2f}' for v in data.values], padding=3, fontsize=9)
         
         fig.suptitle(title, fontsize=16, fontweight='bold', y=1.02)
-        plt.tight_layout()
+        fig.tight_layout()
         self._save_figure(fig, filename)
-        plt.close(fig)
     
     def plot_pie_chart(
         self,
@@ -270,10 +369,11 @@ class Visualizer:
             title: Chart title
             filename: Output filename
         """
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig = self._get_fig(self.figsize)
+        ax = fig.add_subplot()
         
         # Create pie chart without labels on slices
-        colors = plt.cm.Set3(np.linspace(0, 1, len(data)))
+        colors = _palette('Set3', len(data), 0.0, 1.0)
         wedges, texts, autotexts = ax.pie(
             data.values,
             autopct='%1.1f%%',
@@ -296,9 +396,8 @@ class Visualizer:
         
         ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
         
-        plt.tight_layout()
+        fig.tight_layout()
         self._save_figure(fig, filename)
-        plt.close(fig)
     
     def plot_comparison_bars(
         self,
@@ -316,13 +415,14 @@ class Visualizer:
             ylabel: Y-axis label
             filename: Output filename
         """
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = self._get_fig((10, 6))
+        ax = fig.add_subplot()
         
         # Sort data for better visualization
         data_sorted = data.sort_values(ascending=True)
         
         # Create horizontal bars
-        colors = plt.cm.RdYlGn(np.linspace(0.2, 0.8, len(data_sorted)))
+        colors = _palette('RdYlGn', len(data_sorted), 0.2, 0.8)
         bars = ax.barh(range(len(data_sorted)), data_sorted.values, color=colors, alpha=0.8)
         
         # Formatting
@@ -333,26 +433,31 @@ class Visualizer:
         ax.grid(True, alpha=0.3, axis='x', linestyle='--')
         
         # Add value labels
-        for i, (bar, value) in enumerate(zip(bars, data_sorted.values)):
-            width = bar.get_width()
-            ax.text(
-                width, bar.get_y() + bar.get_height() / 2.,
-                f'{value:.2f}',
-                ha='left', va='center', fontsize=9, fontweight='bold'
-            )
+        ax.bar_label(
+            bars,
+            labels=[f'{v:.2f}' for v in data_sorted.values],
+            label_type='edge', padding=3, fontsize=9, fontweight='bold'
+        )
         
-        plt.tight_layout()
+        fig.tight_layout()
         self._save_figure(fig, filename)
-        plt.close(fig)
     
-    def _save_figure(self, fig: plt.Figure, filename: str) -> None:
+    def _save_figure(self, fig: Figure, filename: str, high_res: bool = False) -> None:
         """
         Save figure to output directory.
         
         Args:
             fig: Matplotlib figure object
             filename: Output filename
+            high_res: Save at the full detail DPI instead of the raster DPI
         """
         output_path = self.output_dir / filename
-        fig.savefig(output_path, dpi=self.dpi, bbox_inches='tight', facecolor='auto')
+        dpi = self.dpi if high_res else self.dpi_raster
+        
+        # The zlib level only applies to PNG; vector backends reject pil_kwargs
+        save_kwargs = {}
+        if output_path.suffix.lower() == '.png':
+            save_kwargs['pil_kwargs'] = {'compress_level': self.compress_level, 'optimize': False}
+        
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight', facecolor='auto', **save_kwargs)
         print(f"Saved: {output_path}")